@@ -412,10 +412,28 @@ class NetCheck(object):
         loop_time: The datetime representing when the current program loop began.
         """
         current_connection_ids = []
+        # Read the activation state of all connections at once rather than querying
+        #   NetworkManager once per connection. If that fails, each connection is checked
+        #   individually so one failed read does not skip the rest of this pass.
+        activated_connection_ids = None
+        try:
+            activated_connection_ids = self.network_helper.get_activated_connection_ids()
+        except Exception as exception:  #pylint: disable=broad-except
+            self.logger.error(
+                'Unexpected error while reading the activated connections. Checking each '
+                'connection individually. %s: %s\n%s', type(exception).__name__,
+                str(exception), traceback.format_exc())
+
         for connection_id in self.config['connection_ids']:
             try:
                 connection_context = self.connection_contexts[connection_id]
-                if not self.network_helper.connection_is_activated(connection_context['id']):
+                if activated_connection_ids is None:
+                    connection_activated = self.network_helper.connection_is_activated(
+                        connection_context['id'])
+                else:
+                    connection_activated = \
+                        connection_context['id'] in activated_connection_ids
+                if not connection_activated:
                     connection_context['activated'] = False
 
                 if not connection_context['activated']:
@@ -782,21 +800,39 @@ class NetCheck(object):
 
         default_routes = self.ip_route.get_default_routes()
         if default_routes:
-            default_gateway_state = {
-                'address': None,
-                'interface': None,
-                'connection_id': None}
             route_attributes = dict(default_routes[0]['attrs'])
-            default_gateway_state['address'] = route_attributes['RTA_GATEWAY']
             output_interface_id = route_attributes['RTA_OIF']
-            interface = next((dict(interface) for interface in self.ip_route.get_links(
-                ) if dict(interface)['index'] == output_interface_id))
-            interface_attributes = dict(interface['attrs'])
-            default_gateway_state['interface'] = interface_attributes['IFLA_IFNAME']
-
-            default_gateway_state['connection_id'] = \
-                self.network_helper.get_connection_for_interface(
-                    default_gateway_state['interface'])
+
+            # Only request the output interface instead of dumping every link on the system.
+            #   Depending on the pyroute2 version, a missing interface either raises
+            #   NetlinkError or returns no links.
+            interfaces = []
+            try:
+                interfaces = self.ip_route.get_links(output_interface_id)
+            except pyroute2.NetlinkError as exception:
+                self.logger.debug('_get_default_gateway_state: Failed to read interface %d. '
+                                  '%s: %s', output_interface_id, type(exception).__name__,
+                                  str(exception))
+
+            if not interfaces:
+                # The interface was most likely removed after the routes were read, so the
+                #   route is gone too. The new default gateway is picked up on the next
+                #   check.
+                self.logger.warning(
+                    'The default route\'s output interface (index %d) no longer exists. '
+                    'Treating it as if there is no default gateway.', output_interface_id)
+            else:
+                default_gateway_state = {
+                    'address': None,
+                    'interface': None,
+                    'connection_id': None}
+                default_gateway_state['address'] = route_attributes['RTA_GATEWAY']
+                interface_attributes = dict(interfaces[0]['attrs'])
+                default_gateway_state['interface'] = interface_attributes['IFLA_IFNAME']
+
+                default_gateway_state['connection_id'] = \
+                    self.network_helper.get_connection_for_interface(
+                        default_gateway_state['interface'])
         else:
             self.logger.trace('No default routes are defined.')
 
@@ -23,27 +23,47 @@ __version__ = '0.8'
 
 import logging
 import random
-import re
-import datetime
+import threading
 import time
 import traceback
+import types
+import dbus
+import dbus.lowlevel
 from dbus import DBusException
 
 SERVICE_UNKNOWN_MAX_DELAY = 1  # In seconds.
 SERVICE_UNKNOWN_MAX_ATTEMPTS = 3
 VANISHED_SYMBOL_MAX_ATTEMPTS = 3
-
-NETWORKMANAGER_ACTIVATION_CHECK_DELAY = 0.1
-
-NM_CONNECTION_ACTIVATING = "NM_CONNECTION_ACTIVATED"
-NM_CONNECTION_ACTIVATED = "NM_CONNECTION_ACTIVATED"
-NM_CONNECTION_DISCONNECTED = "NM_CONNECTION_DISCONNECTED"
-
-SERVICE_UNKNOWN_PATTERN = re.compile(
-    r'^org\.freedesktop\.DBus\.Error\.ServiceUnknown:')
-UNKNOWN_METHOD_PATTERN = re.compile(
-    r'^org\.freedesktop\.DBus\.Error\.UnknownMethod: No such interface '
-    r"'org\.freedesktop\.DBus\.Properties' on object at path ")
+# The delays between attempts to import the NetworkManager module.
+NETWORKMANAGER_IMPORT_RETRY_DELAYS = (10, 30)  # In seconds.
+
+# The delay between activation checks starts small and doubles up to the maximum.
+NETWORKMANAGER_ACTIVATION_CHECK_MIN_DELAY = 0.02  # In seconds.
+NETWORKMANAGER_ACTIVATION_CHECK_MAX_DELAY = 0.5  # In seconds.
+
+NM_CONNECTION_DISCONNECTED = 0
+NM_CONNECTION_ACTIVATING = 1
+NM_CONNECTION_ACTIVATED = 2
+
+NM_BUS_NAME = 'org.freedesktop.NetworkManager'
+NM_OBJECT_PATH = '/org/freedesktop/NetworkManager'
+NM_INTERFACE = 'org.freedesktop.NetworkManager'
+NM_ACTIVE_CONNECTION_INTERFACE = 'org.freedesktop.NetworkManager.Connection.Active'
+NM_DEVICE_INTERFACE = 'org.freedesktop.NetworkManager.Device'
+NM_SETTINGS_OBJECT_PATH = '/org/freedesktop/NetworkManager/Settings'
+NM_SETTINGS_INTERFACE = 'org.freedesktop.NetworkManager.Settings'
+NM_SETTINGS_CONNECTION_INTERFACE = 'org.freedesktop.NetworkManager.Settings.Connection'
+NM_IP4_CONFIG_INTERFACE = 'org.freedesktop.NetworkManager.IP4Config'
+NM_IP6_CONFIG_INTERFACE = 'org.freedesktop.NetworkManager.IP6Config'
+# D-Bus object path properties are set to this when they do not refer to an object.
+DBUS_NULL_OBJECT_PATH = '/'
+DBUS_PROPERTIES_INTERFACE = 'org.freedesktop.DBus.Properties'
+DBUS_SERVICE_UNKNOWN_ERROR = 'org.freedesktop.DBus.Error.ServiceUnknown'
+DBUS_UNKNOWN_METHOD_ERROR = 'org.freedesktop.DBus.Error.UnknownMethod'
+NM_UNKNOWN_DEVICE_ERROR = 'org.freedesktop.NetworkManager.UnknownDevice'
+
+# Records whether a reiterative decorated method is already running on the current thread.
+_reiterative_state = threading.local()
 
 
 class RetryExhaustionException(Exception):
@@ -75,18 +95,15 @@ def reiterative(method):
         args: A tuple of the method's positional arguments.
         kwargs: A dictionary of the method's keyword arguments.
         """
-        stack_trace = traceback.extract_stack()
-        current_frame = stack_trace[-1]
-        in_decorator = False
-        for frame in stack_trace[:-1]:
-            if frame[0] == current_frame[0] and frame[3] == current_frame[3]:
-                in_decorator = True
-
         return_value = None
-        if in_decorator:
+        if getattr(_reiterative_state, 'in_decorator', False):
             return_value = method(self, *args, **kwargs)
         else:
-            return_value = _retry_on_exceptions(self, *args, **kwargs)
+            _reiterative_state.in_decorator = True
+            try:
+                return_value = _retry_on_exceptions(self, *args, **kwargs)
+            finally:
+                _reiterative_state.in_decorator = False
 
         return return_value
 
@@ -98,7 +115,7 @@ def reiterative(method):
         args: A tuple of the method's positional arguments.
         kwargs: A dictionary of the method's keyword arguments.
         """
-        method_start_time = datetime.datetime.now()
+        method_start_time = time.monotonic()
         delay_from_service_unknown = 0
         service_unknown_count = 0
         vanished_symbol_count = 0
@@ -109,7 +126,8 @@ def reiterative(method):
                 return_value = method(self, *args, **kwargs)
                 finished = True
             except DBusException as exception:
-                if SERVICE_UNKNOWN_PATTERN.match(str(exception)):
+                dbus_error_name = exception.get_dbus_name()
+                if dbus_error_name == DBUS_SERVICE_UNKNOWN_ERROR:
                     if service_unknown_count == 0:
                         self.logger.warning(
                             'ServiceUnknown exception detected. NetworkManager might be '
@@ -118,11 +136,10 @@ def reiterative(method):
                             str(exception))
 
                     service_unknown_count += 1
-                    NetworkManagerHelper.NetworkManager.SignalDispatcher.handle_restart(
+                    self.NetworkManager.SignalDispatcher.handle_restart(
                         'org.freedesktop.NetworkManager', 'please', 'work')
-                    new_method_start_time = datetime.datetime.now()
-                    delay_since_last_attempt = (
-                        new_method_start_time - method_start_time).total_seconds()
+                    new_method_start_time = time.monotonic()
+                    delay_since_last_attempt = new_method_start_time - method_start_time
                     delay_from_service_unknown += delay_since_last_attempt
                     method_start_time = new_method_start_time
                     if service_unknown_count < SERVICE_UNKNOWN_MAX_ATTEMPTS \
@@ -133,7 +150,11 @@ def reiterative(method):
                             service_unknown_count, delay_from_service_unknown)
                         raise RetryExhaustionException(message) from exception
 
-                elif UNKNOWN_METHOD_PATTERN.match(str(exception)):
+                # Reading a property of an object that no longer exists raises UnknownMethod
+                #   naming the properties interface. The rest of the message differs between
+                #   D-Bus implementations and locales, so only the interface name is checked.
+                elif dbus_error_name == DBUS_UNKNOWN_METHOD_ERROR \
+                        and DBUS_PROPERTIES_INTERFACE in str(exception.get_dbus_message()):
                     vanished_symbol_count += 1
                     if vanished_symbol_count >= VANISHED_SYMBOL_MAX_ATTEMPTS:
                         message = 'Missing symbol after %d retry attempts.' % \
@@ -142,7 +163,7 @@ def reiterative(method):
                 else:
                     raise
 
-            except NetworkManagerHelper.ObjectVanished as exception:
+            except self.ObjectVanished as exception:
                 vanished_symbol_count += 1
                 if vanished_symbol_count >= VANISHED_SYMBOL_MAX_ATTEMPTS:
                     message = 'Missing symbol after %d retry attempts.' % \
@@ -159,10 +180,11 @@ class NetworkManagerHelper(object):
     D-Bus API. All methods will retry for a bit when encountering exceptions that the
     NetworkManager API frequently throws.
     """
-    # TODO: Eventually remove this non-sense once we implement propper logging. (Yes, this is
-    #   all to support our logger as an instance variable.) (gpgmailer issue 18)
-    NetworkManager = None
-    ObjectVanished = None
+    # NetworkManager and ObjectVanished hold the python-networkmanager module and its
+    #   ObjectVanished exception. They are imported by _import_network_manager.
+    __slots__ = ('logger', 'connection_activation_timeout', 'connection_ids', 'random',
+                 'active_connection_state_dict', 'system_bus', 'NetworkManager',
+                 'ObjectVanished')
 
     def __init__(self, config):
         """Constructor.
@@ -172,18 +194,37 @@ class NetworkManagerHelper(object):
 
         self.logger = logging.getLogger(__name__)
         self.connection_activation_timeout = config['connection_activation_timeout']
-        self.connection_ids = config['connection_ids']
+        # Only used for membership tests.
+        self.connection_ids = frozenset(config['connection_ids'])
 
-        self.random = random.SystemRandom()
+        # Device selection does not need cryptographic randomness, so avoid reading
+        #   /dev/urandom for every pick. random.Random seeds itself from the OS.
+        self.random = random.Random()
 
         self._import_network_manager()
 
+        # dbus.SystemBus() returns the same shared connection python-networkmanager uses.
+        self.system_bus = dbus.SystemBus()
+
+        # Maps NetworkManager active connection states to the connection states used by this
+        #   module. Any state not listed is treated as disconnected.
+        self.active_connection_state_dict = {
+            self.NetworkManager.NM_ACTIVE_CONNECTION_STATE_ACTIVATING:
+                NM_CONNECTION_ACTIVATING,
+            self.NetworkManager.NM_ACTIVE_CONNECTION_STATE_ACTIVATED:
+                NM_CONNECTION_ACTIVATED}
+
     @reiterative
     def get_all_connection_ids(self):
         """Returns all connection IDs known to NetworkManager."""
         connection_ids = []
-        for connection in self.NetworkManager.Settings.ListConnections():
-            connection_ids.append(connection.GetSettings()['connection']['id'])
+        # The connections are read directly from D-Bus. See _get_connection_id.
+        for connection_path in self.system_bus.call_blocking(
+                NM_BUS_NAME, NM_SETTINGS_OBJECT_PATH, NM_SETTINGS_INTERFACE,
+                'ListConnections', '', ()):
+            connection_id = self._get_connection_id(connection_path)
+            if connection_id is not None:
+                connection_ids.append(connection_id)
 
         return connection_ids
 
@@ -193,16 +234,20 @@ class NetworkManagerHelper(object):
         this is implemented by doing a WiFi scan.
         """
         for device in self.NetworkManager.NetworkManager.GetDevices():
-            if hasattr(device.SpecificDevice(), "RequestScan") and callable(
-                    device.SpecificDevice().RequestScan):
+            # Only wireless devices can scan.
+            request_scan = getattr(device.SpecificDevice(), 'RequestScan', None)
+            if callable(request_scan):
                 try:
-                    device.SpecificDevice().RequestScan({})
+                    request_scan({})
                 except DBusException as exception:
-                    # This is logged as debug because it occurs so frequently.
-                    self.logger.debug(
-                        'update_available_connections: An error occurred while requesting '
-                        'scan from device %s. %s: %s\n%s', device.Interface,
-                        type(exception).__name__, str(exception), traceback.format_exc())
+                    # This is logged as debug because it occurs so frequently. Skip building
+                    #   the message when it would be thrown away, since reading the interface
+                    #   name is a D-Bus call and the traceback is formatted eagerly.
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug(
+                            'update_available_connections: An error occurred while '
+                            'requesting scan from device %s. %s: %s\n%s', device.Interface,
+                            type(exception).__name__, str(exception), traceback.format_exc())
 
     @reiterative
     def activate_connections_quickly(self, connection_ids):
@@ -210,42 +255,58 @@ class NetworkManagerHelper(object):
         was successful (obtains a gateway IP). The method returns once an activation attempt
         has been made with each network device or when there are no more connection IDs left
         to process. This method is intended to be used when the program first starts to
-        ensure access to the Internet is established as quickly as possible.
+        ensure access to the Internet is established as quickly as possible. Because nothing
+        is done with the results, the activation requests are sent without waiting for
+        NetworkManager to reply, so activation errors are not reported. The bus does not
+        report undelivered requests either, so NetworkManager's presence on the bus is
+        checked before they are sent.
 
         connection_ids: A list of NetworkManager connection IDs to activate in preferred
           order.
         """
 
-        # Create a connection to device multi-map.
+        # Only used for membership tests.
+        connection_id_set = frozenset(connection_ids)
+
+        # Create a connection to device multi-map. Only the first connection found with each
+        #   ID is activated.
         connection_devices_dict = {}
+        connection_id_dict = {}
         for device in self.NetworkManager.NetworkManager.GetDevices():
             # See if the connection is already activated.
             applied_connection = self._get_applied_connection(device)
             if not applied_connection \
-                    or applied_connection['connection']['id'] not in connection_ids:
-                for connection in device.AvailableConnections:
-                    available_connection_id = connection.GetSettings()['connection']['id']
-                    if available_connection_id in connection_ids:
+                    or applied_connection['connection']['id'] not in connection_id_set:
+                for connection_path, available_connection_id in \
+                        self._get_available_connection_ids(device, connection_id_dict):
+                    if available_connection_id in connection_id_set:
                         connection_devices_dict.setdefault(
-                            available_connection_id, (connection, []))[1].append(device)
+                            available_connection_id, (connection_path, []))[1].append(device)
 
-        used_devices = []
-        for connection_id in connection_devices_dict:
+        # A request without a reply to a missing service is silently dropped, so raise the
+        #   error a normal call would have raised. The reiterative decorator then retries
+        #   while NetworkManager is starting or restarting.
+        if not self.system_bus.name_has_owner(NM_BUS_NAME):
+            raise DBusException('%s is not running.' % NM_BUS_NAME,
+                                name=DBUS_SERVICE_UNKNOWN_ERROR)
+
+        # Devices are tracked by object path because comparing NetworkManager.Device objects
+        #   makes D-Bus calls.
+        used_device_paths = set()
+        for connection_path, connection_devices in connection_devices_dict.values():
 
             # Try to activate the connection with a random available device.
-            connection, connection_devices = connection_devices_dict[connection_id]
-            for used_device in used_devices:
-                if used_device in connection_devices:
-                    connection_devices.remove(used_device)
-            if connection_devices:
-                device = connection_devices[self.random.randint(
-                    0, len(connection_devices) - 1)]
+            unused_devices = [device for device in connection_devices
+                              if device.object_path not in used_device_paths]
+            if unused_devices:
+                device = self.random.choice(unused_devices)
 
-                # '/' means pick an access point automatically (if applicable).
-                self.NetworkManager.NetworkManager.ActivateConnection(
-                    connection, device, '/')
+                self._activate_connection_without_reply(connection_path, device.object_path)
 
-                used_devices.append(device)
+                used_device_paths.add(device.object_path)
+
+        # Send the queued activation requests.
+        self.system_bus.flush()
 
     @reiterative
     def activate_connection_and_steal_device(
@@ -269,36 +330,59 @@ class NetworkManagerHelper(object):
         available_devices = []
         used_devices = []
         used_device_connection_dict = {}
+        connection_id_dict = {}
         connection = None
+        activation_wait_failed = False
         for device in self.NetworkManager.NetworkManager.GetDevices():
-            # See if the connection is already activated.
-            applied_connection = self._get_applied_connection(device)
+            # See if the connection is already activated or being activated.
+            # Both checks need the device state, so only read it once.
+            device_state = device.State
+            applied_connection = self._get_applied_connection(device, device_state)
+            activating_connection = None
+            if not applied_connection:
+                activating_connection = self._get_activating_connection(
+                    device, connection_id, device_state)
             if applied_connection \
                     and applied_connection['connection']['id'] == connection_id:
-                if self._wait_for_gateway_ip(device, applied_connection):
+                if self._wait_for_gateway_ip(device, connection_id):
                     # The connection is already activated.
                     # I do hate multiple returns but this does seem the most Pythonic.
                     return True
+            elif activating_connection:
+                if self._wait_for_gateway_ip(device, connection_id):
+                    # The connection finished activating.
+                    return True
+                # The device is not tried again, so a failed activation does not block for
+                #   a second full timeout on the same device.
+                activation_wait_failed = True
             elif excluded_connection_ids is None or applied_connection is None \
                     or applied_connection['connection']['id'] not in excluded_connection_ids:
-                for available_connection in device.AvailableConnections:
-                    if available_connection.GetSettings()['connection']['id'] \
-                            == connection_id:
-                        connection = available_connection
+                for connection_path, available_connection_id in \
+                        self._get_available_connection_ids(device, connection_id_dict):
+                    if available_connection_id == connection_id:
+                        if connection is None:
+                            connection = self.NetworkManager.Connection(connection_path)
                         if not applied_connection:
                             available_devices.append(device)
                         else:
                             used_devices.append(device)
                             used_device_connection_dict[
                                 device.object_path] = applied_connection['connection']['id']
-
-        if connection is None:
+                        # The device only needs to be recorded once.
+                        break
+
+        if connection is None and activation_wait_failed:
+            self.logger.debug('activate_connection_and_steal_device: Connection "%s" did '
+                              'not finish activating and no other device is available.',
+                              connection_id)
+        elif connection is None:
             self.logger.debug('activate_connection_and_steal_device: '
                               'Connection "%s" is not available.', connection_id)
         else:
             # Try to activate the connection with a random available device.
             success = self._activate_with_random_devices(
                 connection=connection,
+                connection_id=connection_id,
                 devices=available_devices,
                 stolen_connection_ids=stolen_connection_ids,
                 used_device_connection_dict=used_device_connection_dict)
@@ -306,6 +390,7 @@ class NetworkManagerHelper(object):
                 # Try to activate the connection with a random used device.
                 success = self._activate_with_random_devices(
                     connection=connection,
+                    connection_id=connection_id,
                     devices=used_devices,
                     stolen_connection_ids=stolen_connection_ids,
                     used_device_connection_dict=used_device_connection_dict)
@@ -325,42 +410,60 @@ class NetworkManagerHelper(object):
 
         # Get a list of all devices this connection can be applied to.
         available_devices = []
+        connection_id_dict = {}
         connection = None
+        activation_wait_failed = False
         for device in self.NetworkManager.NetworkManager.GetDevices():
-            # See if the connection is already activated.
-            applied_connection = self._get_applied_connection(device)
+            # See if the connection is already activated or being activated.
+            # Both checks need the device state, so only read it once.
+            device_state = device.State
+            applied_connection = self._get_applied_connection(device, device_state)
+            activating_connection = None
+            if not applied_connection:
+                activating_connection = self._get_activating_connection(
+                    device, connection_id, device_state)
             if applied_connection \
                     and applied_connection['connection']['id'] == connection_id:
-                if self._wait_for_gateway_ip(device, applied_connection):
+                if self._wait_for_gateway_ip(device, connection_id):
                     # The connection is already activated.
                     # I do hate multiple returns but this does seem the most Pythonic.
                     return True
+            elif activating_connection:
+                if self._wait_for_gateway_ip(device, connection_id):
+                    # The connection finished activating.
+                    return True
+                # The device is not tried again, so a failed activation does not block for
+                #   a second full timeout on the same device.
+                activation_wait_failed = True
             elif not applied_connection \
                     or applied_connection['connection']['id'] not in self.connection_ids:
-                for available_connection in device.AvailableConnections:
-                    if available_connection.GetSettings()['connection']['id'] \
-                            == connection_id:
-                        connection = available_connection
+                for connection_path, available_connection_id in \
+                        self._get_available_connection_ids(device, connection_id_dict):
+                    if available_connection_id == connection_id:
+                        if connection is None:
+                            connection = self.NetworkManager.Connection(connection_path)
                         available_devices.append(device)
+                        # The device only needs to be recorded once.
+                        break
 
-        if connection is None:
+        if connection is None and activation_wait_failed:
+            self.logger.debug('activate_connection_with_available_device: Connection "%s" '
+                              'did not finish activating and no other device is available.',
+                              connection_id)
+        elif connection is None:
             self.logger.debug('activate_connection_with_available_device: Connection "%s" '
                               'is not available.', connection_id)
         else:
-            # Try to activate the connection with a random available device.
-            success = False
-            devices_left = len(available_devices)
-            while not success and devices_left:
-                random_index = self.random.randint(0, devices_left - 1)
-                available_device = available_devices[random_index]
-                available_devices[random_index] = available_devices[devices_left - 1]
-                devices_left -= 1
-
+            # Try to activate the connection with each available device in a random order.
+            self.random.shuffle(available_devices)
+            for available_device in available_devices:
                 # '/' means pick an access point automatically (if applicable).
-                self.NetworkManager.NetworkManager.ActivateConnection(
+                active_connection = self.NetworkManager.NetworkManager.ActivateConnection(
                     connection, available_device, '/')
                 success = self._wait_for_gateway_ip(
-                    available_device, connection.GetSettings())
+                    available_device, connection_id, active_connection)
+                if success:
+                    break
 
         return success
 
@@ -388,13 +491,7 @@ class NetworkManagerHelper(object):
 
         connection_id: The displayed name of the connection in NetworkManager to deactivate.
         """
-        active_connection = None
-        for device in self.NetworkManager.NetworkManager.GetDevices():
-            # See if the connection is already activated.
-            if device.ActiveConnection and device.ActiveConnection.Connection.GetSettings()[
-                    'connection']['id'] == connection_id:
-                active_connection = device.ActiveConnection
-                break
+        active_connection = self._get_active_connection(connection_id)
 
         if not active_connection:
             self.logger.warning('Could not find active connection "%s".', connection_id)
@@ -411,13 +508,40 @@ class NetworkManagerHelper(object):
 
         connection_is_activated = False
 
-        connection_state = self._get_connection_activation_state(connection_id)
+        connection_state = self._get_connection_activation_state(
+            connection_id, self._get_active_connection(connection_id))
 
-        if connection_state is NM_CONNECTION_ACTIVATED:
+        if connection_state == NM_CONNECTION_ACTIVATED:
             connection_is_activated = True
 
         return connection_is_activated
 
+    @reiterative
+    def get_activated_connection_ids(self):
+        """Reads NetworkManager's active connections once and returns the IDs of those that
+        are activated. This is cheaper than calling connection_is_activated for each
+        connection when the state of several connections is needed at the same time.
+
+        Returns a set of connection IDs.
+        """
+        activated_connection_ids = set()
+        for active_connection_path in self._get_network_manager_property(
+                NM_OBJECT_PATH, NM_INTERFACE, 'ActiveConnections'):
+            try:
+                # State and Id are read together in one call.
+                active_connection_properties = self._get_network_manager_properties(
+                    active_connection_path, NM_ACTIVE_CONNECTION_INTERFACE)
+                if active_connection_properties['State'] \
+                        == self.NetworkManager.NM_ACTIVE_CONNECTION_STATE_ACTIVATED:
+                    activated_connection_ids.add(active_connection_properties['Id'])
+            except self.ObjectVanished:
+                # The connection was deactivated after the list was read, so it is not
+                #   activated.
+                self.logger.trace('get_activated_connection_ids: Active connection %s '
+                                  'vanished.', active_connection_path)
+
+        return activated_connection_ids
+
     @reiterative
     def get_connection_for_interface(self, interface_name):
         """Find the connection ID currently applied to the given interface.
@@ -426,16 +550,22 @@ class NetworkManagerHelper(object):
         Returns the connection ID.
         """
         connection_id = None
-        devices = []
+        device = None
 
         try:
-            devices = self.NetworkManager.NetworkManager.GetDevices()
+            # Ask NetworkManager for the device directly rather than reading the interface
+            #   name of every device.
+            try:
+                device = self.NetworkManager.NetworkManager.GetDeviceByIpIface(
+                    interface_name)
+            except DBusException as exception:
+                if exception.get_dbus_name() != NM_UNKNOWN_DEVICE_ERROR:
+                    raise
 
-            for device in devices:
-                if device.Interface == interface_name:
-                    connection_settings = self._get_applied_connection(device)
-                    if connection_settings:
-                        connection_id = connection_settings['connection']['id']
+            if device:
+                connection_settings = self._get_applied_connection(device)
+                if connection_settings:
+                    connection_id = connection_settings['connection']['id']
 
         except Exception as exception:
             message = 'Error while getting connection ID for interface %s.' % interface_name
@@ -448,115 +578,174 @@ class NetworkManagerHelper(object):
         """Imports the NetworkManager module and related modules with retry support. Retry
         support was added in case NetworkManager is restarting when this program starts.
         """
-        try:
-            import NetworkManager
-            NetworkManagerHelper.NetworkManager = staticmethod(NetworkManager)
-            from NetworkManager import ObjectVanished
-            NetworkManagerHelper.ObjectVanished = staticmethod(ObjectVanished)
-        except Exception as exception:  #pylint: disable=broad-except
-            self.logger.error(
-                'Failed to import NetworkManager or ObjectVanished. Will retry in 10 '
-                'seconds. %s: %s\n%s', type(exception).__name__, str(exception),
-                traceback.format_exc())
-            time.sleep(10)
-
+        import_attempts = 0
+        imported = False
+        while not imported:
             try:
                 import NetworkManager
-                NetworkManagerHelper.NetworkManager = staticmethod(NetworkManager)
+                self.NetworkManager = NetworkManager
                 from NetworkManager import ObjectVanished
-                NetworkManagerHelper.ObjectVanished = staticmethod(ObjectVanished)
-            except Exception as exception2:  #pylint: disable=broad-except
+                self.ObjectVanished = ObjectVanished
+                imported = True
+            except Exception as exception:  #pylint: disable=broad-except
+                if import_attempts >= len(NETWORKMANAGER_IMPORT_RETRY_DELAYS):
+                    message = \
+                        'Failed to import NetworkManager or ObjectVanished in %d seconds. ' \
+                        'This probably means the NetworkManager daemon failed to start. ' \
+                        'Giving up' % sum(NETWORKMANAGER_IMPORT_RETRY_DELAYS)
+                    raise RetryExhaustionException(message) from exception
+
+                retry_delay = NETWORKMANAGER_IMPORT_RETRY_DELAYS[import_attempts]
                 self.logger.error(
-                    'Failed again to import NetworkManager or ObjectVanished. Will retry '
-                    'once again in 30 seconds. %s: %s\n%s', type(exception2).__name__,
-                    str(exception2), traceback.format_exc())
-                time.sleep(30)
+                    'Failed to import NetworkManager or ObjectVanished. Will retry in %d '
+                    'seconds. %s: %s\n%s', retry_delay, type(exception).__name__,
+                    str(exception), traceback.format_exc())
+                time.sleep(retry_delay)
+                import_attempts += 1
+
+    def _activate_connection_without_reply(self, connection_path, device_path):
+        """Queues an ActivateConnection request that NetworkManager will not reply to. The
+        request is sent the next time the system bus is used or flushed.
+
+        connection_path: The D-Bus object path of the connection to activate.
+        device_path: The D-Bus object path of the network device to activate the connection
+          with.
+        """
+        message = dbus.lowlevel.MethodCallMessage(
+            NM_BUS_NAME, NM_OBJECT_PATH, NM_INTERFACE, 'ActivateConnection')
+        # '/' means pick an access point automatically (if applicable).
+        message.append(connection_path, device_path, DBUS_NULL_OBJECT_PATH, signature='ooo')
+        message.set_no_reply(True)
+        self.system_bus.send_message(message)
 
-                try:
-                    import NetworkManager
-                    NetworkManagerHelper.NetworkManager = staticmethod(NetworkManager)
-                    from NetworkManager import ObjectVanished
-                    NetworkManagerHelper.ObjectVanished = staticmethod(ObjectVanished)
-                except Exception as exception3:  #pylint: disable=broad-except
-                    message = \
-                        'Failed to import NetworkManager or ObjectVanished in 40 ' \
-                        'seconds. This probably means the NetworkManager daemon failed ' \
-                        'to start. Giving up'
-                    raise RetryExhaustionException(message) from exception3
+    def _get_available_connection_ids(self, device, connection_id_dict):
+        """Returns the connections that can be activated with the supplied network device.
+
+        device: A NetworkManager API object representing a network device.
+        connection_id_dict: A dictionary mapping connection object paths to connection IDs
+          that were already read during the current call. Connections available on several
+          devices are then only read once. Newly read IDs are added to it.
+        Returns a list of (connection object path, connection ID) tuples.
+        """
+        available_connection_ids = []
+        for connection_path in self._get_network_manager_property(
+                device.object_path, NM_DEVICE_INTERFACE, 'AvailableConnections'):
+            if connection_path not in connection_id_dict:
+                connection_id_dict[connection_path] = \
+                    self._get_connection_id(connection_path)
+
+            if connection_id_dict[connection_path] is not None:
+                available_connection_ids.append(
+                    (connection_path, connection_id_dict[connection_path]))
+
+        return available_connection_ids
+
+    def _get_connection_id(self, connection_path):
+        """Reads the ID of a connection settings profile. The settings are read directly
+        from D-Bus because python-networkmanager calls GetSettings when it creates each
+        Connection object, and reading the connection ID requires calling GetSettings again.
+
+        connection_path: The D-Bus object path of the connection settings profile.
+        Returns the connection ID or None if the connection no longer exists.
+        """
+        connection_id = None
+        try:
+            connection_settings = self.system_bus.call_blocking(
+                NM_BUS_NAME, connection_path, NM_SETTINGS_CONNECTION_INTERFACE,
+                'GetSettings', '', ())
+            connection_id = connection_settings['connection']['id']
+        except DBusException as exception:
+            # The connection was deleted after its path was read.
+            if exception.get_dbus_name() != DBUS_UNKNOWN_METHOD_ERROR:
+                raise
 
-    def _activate_with_random_devices(
-            self, connection, devices, stolen_connection_ids, used_device_connection_dict):
+        return connection_id
+
+    def _activate_with_random_devices(self, connection, connection_id, devices,
+                                      stolen_connection_ids, used_device_connection_dict):
         """Activates a connection with a random device until successful or there are no
         more devices left.
 
         connection: A NetworkManager API object representing a connection settings profile.
+        connection_id: The displayed name of the connection in NetworkManager.
         devices: A list of NetworkManager API objects representing devices that can be
-          activated with the connection.
+          activated with the connection. The list is shuffled in place.
         stolen_connection_ids: A list of NetworkManager connection IDs that network devices
           were stolen from. This parameter is used to return information to the caller.
         used_device_connection_dict: A mapping of NetworkManager devices to connection IDs
           representing which connection is associated with an active device.
         """
         success = False
-        devices_left = len(devices)
-        while not success and devices_left:
-            random_index = self.random.randint(0, devices_left - 1)
-            device = devices[random_index]
-            devices[random_index] = devices[devices_left - 1]
-            devices_left -= 1
-
+        self.random.shuffle(devices)
+        for device in devices:
             if device.object_path in used_device_connection_dict:
                 stolen_connection_ids.add(used_device_connection_dict[device.object_path])
 
             # '/' means pick an access point automatically (if applicable).
-            self.NetworkManager.NetworkManager.ActivateConnection(connection, device, '/')
-            success = self._wait_for_gateway_ip(device, connection.GetSettings())
+            active_connection = self.NetworkManager.NetworkManager.ActivateConnection(
+                connection, device, '/')
+            success = self._wait_for_gateway_ip(device, connection_id, active_connection)
+            if success:
+                break
 
         return success
 
-    def _wait_for_gateway_ip(self, device, connection):
+    def _wait_for_gateway_ip(self, device, connection_id, active_connection=None):
         """Wait for the configured number of seconds for the supplied connection to obtain a
         gateway IP.
 
         device: The NetworkManager.Device the connection is being activated with.
-        connection: A NetworkManager.Connection object that is expected to be assigned a
-          gateway IP.
+        connection_id: The displayed name of the connection in NetworkManager that is
+          expected to be assigned a gateway IP.
+        active_connection: The NetworkManager.ActiveConnection returned by
+          ActivateConnection, if the connection was just activated. If None, the active
+          connection is looked up by connection ID.
         Returns True if the connection is assigned a gateway. False otherwise.
         """
         success = False
         give_up = False
-        connection_id = connection['connection']['id']
-        time_to_give_up = time.time() + self.connection_activation_timeout
+        # The active connection only needs to be found once. After that, only its state is
+        #   read on each check.
+        if active_connection is None:
+            active_connection = self._get_active_connection(connection_id)
+        time_to_give_up = time.monotonic() + self.connection_activation_timeout
+        check_delay = NETWORKMANAGER_ACTIVATION_CHECK_MIN_DELAY
 
         self.logger.debug('_wait_for_gateway_ip: Waiting for connection "%s"...',
                           connection_id)
         while not success and not give_up:
 
-            connection_state = self._get_connection_activation_state(connection_id)
-            gateway_ip = self._get_gateway_ip(device)
-
-            if connection_state is NM_CONNECTION_DISCONNECTED:
+            connection_state = self._get_connection_activation_state(
+                connection_id, active_connection)
+            # Reading the IP configuration is pointless once the connection is gone.
+            if connection_state == NM_CONNECTION_DISCONNECTED:
                 self.logger.warning('Connection "%s" disconnected while waiting for a '
                                     'gateway IP.', connection_id)
                 give_up = True
 
-            elif gateway_ip:
-                self.logger.debug('_wait_for_gateway_ip: Connection "%s" assigned gateway '
-                                  'IP %s.', connection_id, gateway_ip)
-                success = True
+            else:
+                gateway_ip = self._get_gateway_ip(device)
+                if gateway_ip:
+                    self.logger.debug('_wait_for_gateway_ip: Connection "%s" assigned '
+                                      'gateway IP %s.', connection_id, gateway_ip)
+                    success = True
 
-            elif time.time() > time_to_give_up:
-                self.logger.warning('Connection "%s" timed out while waiting for a gateway '
-                                    'IP.', connection_id)
-                give_up = True
+                elif time.monotonic() > time_to_give_up:
+                    self.logger.warning('Connection "%s" timed out while waiting for a '
+                                        'gateway IP.', connection_id)
+                    give_up = True
 
-            else:
-                time.sleep(NETWORKMANAGER_ACTIVATION_CHECK_DELAY)
+                else:
+                    # Back off so slow activations do not generate a steady stream of D-Bus
+                    #   calls, while fast activations are still noticed quickly. Never sleep
+                    #   past the deadline.
+                    time.sleep(min(check_delay, max(time_to_give_up - time.monotonic(), 0)))
+                    check_delay = min(
+                        check_delay * 2, NETWORKMANAGER_ACTIVATION_CHECK_MAX_DELAY)
 
         return success
 
     # TODO: IPv4 and IPv6 networks do not play nice together. (issue 19)
-    #pylint: disable=no-self-use
     def _get_gateway_ip(self, device):
         """Attempts to retrieve the gateway IP associated with the given device. If the
         gateway IP address is not available, None is returned.
@@ -566,23 +755,43 @@ class NetworkManagerHelper(object):
           otherwise.
         """
         gateway_ip = None
-        if device.Ip4Config:
-            gateway_ip = device.Ip4Config.Gateway
-
-        if not gateway_ip and device.Ip6Config:
-            gateway_ip = device.Ip6Config.Gateway
+        # This method is called repeatedly while waiting for a connection to activate. The
+        #   properties are read directly because python-networkmanager introspects each new
+        #   IP configuration object it creates. Both IP configuration paths are fetched in
+        #   one call since the IPv6 path is needed whenever there is no IPv4 gateway yet.
+        device_properties = self._get_network_manager_properties(
+            device.object_path, NM_DEVICE_INTERFACE)
+        ip4_config_path = device_properties['Ip4Config']
+        if ip4_config_path != DBUS_NULL_OBJECT_PATH:
+            gateway_ip = self._get_network_manager_property(
+                ip4_config_path, NM_IP4_CONFIG_INTERFACE, 'Gateway')
+
+        if not gateway_ip:
+            ip6_config_path = device_properties['Ip6Config']
+            if ip6_config_path != DBUS_NULL_OBJECT_PATH:
+                gateway_ip = self._get_network_manager_property(
+                    ip6_config_path, NM_IP6_CONFIG_INTERFACE, 'Gateway')
+
+        # An empty string means no gateway has been assigned.
+        if not gateway_ip:
+            gateway_ip = None
 
         return gateway_ip
 
-    def _get_applied_connection(self, device):
+    def _get_applied_connection(self, device, device_state=None):
         """Returns the NetworkManager.Connection that is currently 'applied' to the supplied
         network device.
 
         device: A NetworkManager API object representing a network device.
+        device_state: The device's State if the caller has already read it. If None, the
+          state is read from the device.
         Returns the applied connection or None if the device has no applied connection.
         """
         applied_connection = None
-        if device.State == self.NetworkManager.NM_DEVICE_STATE_ACTIVATED:
+        if device_state is None:
+            device_state = device.State
+
+        if device_state == self.NetworkManager.NM_DEVICE_STATE_ACTIVATED:
             try:
                 # 0 means no flags
                 applied_connection, _ = device.GetAppliedConnection(0)
@@ -594,31 +803,62 @@ class NetworkManagerHelper(object):
 
         return applied_connection
 
-    def _get_connection_activation_state(self, connection_id):
+    def _get_activating_connection(self, device, connection_id, device_state=None):
+        """Returns the connection that NetworkManager is part way through activating on the
+        supplied network device if it is the specified connection. Calling ActivateConnection
+        again would restart an activation that might be about to succeed.
+
+        device: A NetworkManager API object representing a network device.
+        connection_id: The displayed name of the connection in NetworkManager.
+        device_state: The device's State if the caller has already read it. If None, the
+          state is read from the device.
+        Returns the connection being activated or None if the device is not activating the
+          specified connection.
+        """
+        activating_connection = None
+        if device_state is None:
+            device_state = device.State
+
+        if self.NetworkManager.NM_DEVICE_STATE_PREPARE <= device_state \
+                <= self.NetworkManager.NM_DEVICE_STATE_SECONDARIES:
+            try:
+                # 0 means no flags
+                applied_connection, _ = device.GetAppliedConnection(0)
+                if applied_connection['connection']['id'] == connection_id:
+                    activating_connection = applied_connection
+            except DBusException as exception:
+                # The activation can fail or finish between reading the state and getting the
+                #   applied connection.
+                self.logger.debug(
+                    '_get_activating_connection: Error getting applied connection for '
+                    'device %s. %s: %s', device.Interface, type(exception).__name__,
+                    str(exception))
+
+        return activating_connection
+
+    def _get_connection_activation_state(self, connection_id, active_connection):
         """Reads the activation state of the connection identified by connection ID.
 
         connection_id: The displayed name of the connection in NetworkManager.
+        active_connection: The NetworkManager.ActiveConnection object for the connection as
+          returned by _get_active_connection. None if the connection is not active.
         Returns a constant representing the current connection state. Possible values are:
           NM_CONNECTION_ACTIVATING, NM_CONNECTION_ACTIVATED, and NM_CONNECTION_DISCONNECTED.
         """
         state = NM_CONNECTION_DISCONNECTED
 
-        active_connection = self._get_active_connection(connection_id)
-
         if active_connection is None:
             self.logger.debug('_get_connection_activation_state: Connection "%s" is not '
                               'activated.', connection_id)
 
         else:
-            if hasattr(active_connection, 'State'):
-                if active_connection.State \
-                        is self.NetworkManager.NM_ACTIVE_CONNECTION_STATE_ACTIVATING:
-                    state = NM_CONNECTION_ACTIVATING
-                if active_connection.State \
-                        is self.NetworkManager.NM_ACTIVE_CONNECTION_STATE_ACTIVATED:
-                    state = NM_CONNECTION_ACTIVATED
-
-            else:
+            # Reading State is a D-Bus call, so it is read once rather than probed with
+            #   hasattr first. python-networkmanager raises ObjectVanished if the active
+            #   connection was removed after it was found.
+            try:
+                state = self.active_connection_state_dict.get(
+                    active_connection.State, NM_CONNECTION_DISCONNECTED)
+            except self.ObjectVanished:
                 self.logger.error('Connection "%s" is no longer activated.',
                                   connection_id)
 
@@ -633,14 +873,76 @@ class NetworkManagerHelper(object):
         """
         matched_active_connection = None
 
-        active_connections = self.NetworkManager.NetworkManager.ActiveConnections
+        # The active connections are read directly from D-Bus. Creating python-networkmanager
+        #   objects for each active connection costs several D-Bus round trips apiece.
+        active_connection_paths = self._get_network_manager_property(
+            NM_OBJECT_PATH, NM_INTERFACE, 'ActiveConnections')
+
+        for active_connection_path in active_connection_paths:
+            try:
+                active_connection_id = self._get_network_manager_property(
+                    active_connection_path, NM_ACTIVE_CONNECTION_INTERFACE, 'Id')
+            except self.ObjectVanished:
+                # The connection was deactivated after the list was read.
+                active_connection_id = None
 
-        for active_connection in active_connections:
-            if active_connection.Connection.GetSettings()[
-                    'connection']['id'] == connection_id:
+            if active_connection_id == connection_id:
                 self.logger.trace('_get_active_connection: Found that connection "%s" is '
                                   'active.', connection_id)
-                matched_active_connection = active_connection
+                matched_active_connection = self.NetworkManager.ActiveConnection(
+                    active_connection_path)
                 break
 
         return matched_active_connection
+
+    def _get_network_manager_property(self, object_path, interface_name, property_name):
+        """Reads a single property of a NetworkManager D-Bus object without creating a
+        python-networkmanager object. The call is addressed to NetworkManager's well-known
+        bus name, so it is not affected by NetworkManager restarting.
+
+        object_path: The D-Bus object path of the NetworkManager object.
+        interface_name: The D-Bus interface the property belongs to.
+        property_name: The name of the property to read.
+        Returns the property value as a dbus-python type. Raises ObjectVanished if the object
+          no longer exists, like python-networkmanager does.
+        """
+        try:
+            property_value = self.system_bus.call_blocking(
+                NM_BUS_NAME, object_path, DBUS_PROPERTIES_INTERFACE, 'Get', 'ss',
+                (interface_name, property_name))
+        except DBusException as exception:
+            if exception.get_dbus_name() == DBUS_UNKNOWN_METHOD_ERROR:
+                raise self._create_object_vanished(object_path) from exception
+            raise
+
+        return property_value
+
+    def _get_network_manager_properties(self, object_path, interface_name):
+        """Reads all properties of one interface of a NetworkManager D-Bus object in a
+        single call. See _get_network_manager_property.
+
+        object_path: The D-Bus object path of the NetworkManager object.
+        interface_name: The D-Bus interface whose properties are read.
+        Returns a dictionary of property names to dbus-python values. Raises ObjectVanished
+          if the object no longer exists.
+        """
+        try:
+            properties = self.system_bus.call_blocking(
+                NM_BUS_NAME, object_path, DBUS_PROPERTIES_INTERFACE, 'GetAll', 's',
+                (interface_name,))
+        except DBusException as exception:
+            if exception.get_dbus_name() == DBUS_UNKNOWN_METHOD_ERROR:
+                raise self._create_object_vanished(object_path) from exception
+            raise
+
+        return properties
+
+    def _create_object_vanished(self, object_path):
+        """Creates the ObjectVanished exception python-networkmanager raises when an object
+        disappears, so raw D-Bus reads are retried the same way by the reiterative decorator.
+
+        object_path: The D-Bus object path of the object that no longer exists.
+        Returns an ObjectVanished exception.
+        """
+        # ObjectVanished only reads the object_path attribute of the object it is given.
+        return self.ObjectVanished(types.SimpleNamespace(object_path=object_path))